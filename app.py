@@ -1,7 +1,25 @@
 import streamlit as st
 from pyairtable import Api
 import pandas as pd
+import hashlib
+import html
+import inspect
+import json
+import re
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import wraps
+from pathlib import Path
+from types import MappingProxyType
 import resend
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
@@ -202,6 +220,20 @@ st.markdown("""
         padding: 0.75rem 1rem;
         margin-bottom: 1rem;
     }
+    .flame-graph {
+        font-family: monospace;
+        font-size: 0.7rem;
+        margin-bottom: 1rem;
+    }
+    .flame-frame {
+        color: #1E293B;
+        border: 1px solid #FFFFFF;
+        border-radius: 2px;
+        padding: 1px 3px;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+    }
 </style>
 """, unsafe_allow_html=True)
 
@@ -218,104 +250,265 @@ if "magic_link_sent" not in st.session_state:
     st.session_state.magic_link_sent = False
 if "team_unlocked" not in st.session_state:
     st.session_state.team_unlocked = False
+if "login_attempts" not in st.session_state:
+    st.session_state.login_attempts = []
+if "profile_reruns_remaining" not in st.session_state:
+    st.session_state.profile_reruns_remaining = 0
+if "profiles" not in st.session_state:
+    st.session_state.profiles = []
+
+# Shared loader cache
+# Loader results are frozen (dicts -> read-only mappings, lists -> tuples) and shared
+# by every session in the process, so a cache hit costs a dict lookup rather than an
+# unpickle, and the total footprint is bounded by entry count and approximate bytes.
+LOADER_CACHE_TTL = 300  # Cache for 5 minutes
+LOADER_CACHE_MAX_ENTRIES = 512
+LOADER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def freeze(value):
+    """Recursively convert dicts/lists into read-only mappings/tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+def approx_size(value):
+    """Approximate memory footprint in bytes of a frozen value"""
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    elif isinstance(value, tuple):
+        size += sum(approx_size(v) for v in value)
+    return size
+
+class SharedCache:
+    """Thread-safe TTL cache with LRU eviction bounded by entry count and bytes"""
+
+    def __init__(self, ttl, max_entries, max_bytes):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, number of threads using it]
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, count=True):
+        """Return (found, value), refreshing the entry's LRU position on a hit"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return True, entry[2]
+                self._remove(key)
+            if count:
+                self.misses += 1
+            return False, None
+
+    @contextmanager
+    def key_lock(self, key):
+        """Serialize computation of one key so concurrent misses query Airtable once"""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def put(self, key, value):
+        size = approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Never let a single oversized result flush the whole cache
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+@st.cache_resource
+def get_loader_cache():
+    return SharedCache(LOADER_CACHE_TTL, LOADER_CACHE_MAX_ENTRIES, LOADER_CACHE_MAX_BYTES)
+
+_loader_state = threading.local()
+
+def shared_cache(error_message, default=None):
+    """Cache a loader's frozen result in the process-wide loader cache.
+
+    Loaders raise on failure. Failures are never cached: the outermost cached call
+    shows error_message and returns default, while nested cached calls re-raise so
+    their caller isn't cached with partial data either. Callers that must tell a
+    failure apart from a legitimate default pass raise_errors=True.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, raise_errors=False):
+            cache = get_loader_cache()
+            key = (func.__name__, args)
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            with cache.key_lock(key):
+                # Another session may have loaded it while we waited
+                found, value = cache.get(key, count=False)
+                if found:
+                    return value
+
+                depth = getattr(_loader_state, "depth", 0)
+                _loader_state.depth = depth + 1
+                try:
+                    value = freeze(func(*args))
+                except Exception as e:
+                    if depth or raise_errors:
+                        raise
+                    st.error(f"{error_message}: {e}")
+                    return default
+                finally:
+                    _loader_state.depth = depth
+
+                # Misses (e.g. unknown mentor emails) are left to the login negative cache
+                # so arbitrary form input can't evict real roster data
+                if value is not None:
+                    cache.put(key, value)
+                return value
+        return wrapper
+    return decorator
+
+def format_bytes(num_bytes):
+    """Format a byte count for display"""
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
 
 # Helper functions
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@shared_cache("Error fetching mentor")
 def get_mentor_by_email(email):
     """Find mentor by email in Mentor Table"""
     tables = get_tables()
-    try:
-        records = tables["mentors"].all(formula=f"LOWER({{Email}}) = LOWER('{email}')")
-        if records:
-            record = records[0]
-            return {
-                "id": record["id"],
-                "name": record["fields"].get("Name") or record["fields"].get("Mentor Name", ""),
-                "email": record["fields"].get("Email", "")
-            }
-    except Exception as e:
-        st.error(f"Error fetching mentor: {e}")
+    records = tables["mentors"].all(formula=f"LOWER({{Email}}) = LOWER('{email}')")
+    if records:
+        record = records[0]
+        return {
+            "id": record["id"],
+            "name": record["fields"].get("Name") or record["fields"].get("Mentor Name", ""),
+            "email": record["fields"].get("Email", "")
+        }
     return None
 
-@st.cache_data(ttl=300)
+def unwrap(val, default=""):
+    """Unwrap Airtable lookup fields (returned as arrays)"""
+    if isinstance(val, list):
+        return val[0] if val else default
+    return val if val is not None else default
+
+def parse_student(record):
+    """Convert a student table record into the dict used throughout the portal"""
+    fields = record["fields"]
+    return {
+        "id": record["id"],
+        "name": fields.get(STUDENT_FIELDS["name"], "Unknown"),
+        "research_area": fields.get(STUDENT_FIELDS["research_area"], ""),
+        "city": fields.get(STUDENT_FIELDS["city"], ""),
+        "graduation_year": fields.get(STUDENT_FIELDS["graduation_year"], ""),
+        "mentor_confirmation": fields.get(STUDENT_FIELDS["mentor_confirmation"], ""),
+        "background_shared": fields.get(STUDENT_FIELDS["background_shared"], ""),
+        "expected_meetings": fields.get(STUDENT_FIELDS["expected_meetings"], 0),
+        "completed_meetings": fields.get(STUDENT_FIELDS["completed_meetings"], 0),
+        "notes_summary": fields.get(STUDENT_FIELDS["notes_summary"], ""),
+        "hours_recorded": fields.get(STUDENT_FIELDS["hours_recorded"], ""),
+        "foundation_student": fields.get(STUDENT_FIELDS["foundation_student"], ""),
+        "tuition_paid": fields.get(STUDENT_FIELDS["tuition_paid"], ""),
+        "program_manager_email": unwrap(fields.get(STUDENT_FIELDS["program_manager_email"], "")),
+        "revised_final_paper_due": unwrap(fields.get(STUDENT_FIELDS["revised_final_paper_due"], "")),
+        "student_no_shows": unwrap(fields.get(STUDENT_FIELDS["student_no_shows"], 0), default=0),
+        "reason_for_interest": unwrap(fields.get(STUDENT_FIELDS["reason_for_interest"], ""))
+    }
+
+@shared_cache("Error fetching students", default=())
 def get_students_for_mentor(mentor_name):
     """Get all students assigned to a mentor"""
     tables = get_tables()
-    try:
-        # Use FIND to search for mentor name in the linked field
-        formula = f"FIND('{mentor_name}', ARRAYJOIN({{Mentor Name}}))"
-        records = tables["students"].all(formula=formula)
-
-        students = []
-        for record in records:
-            fields = record["fields"]
-
-            # Helper to unwrap Airtable lookup fields (returned as arrays)
-            def unwrap(val, default=""):
-                if isinstance(val, list):
-                    return val[0] if val else default
-                return val if val is not None else default
-
-            students.append({
-                "id": record["id"],
-                "name": fields.get(STUDENT_FIELDS["name"], "Unknown"),
-                "research_area": fields.get(STUDENT_FIELDS["research_area"], ""),
-                "city": fields.get(STUDENT_FIELDS["city"], ""),
-                "graduation_year": fields.get(STUDENT_FIELDS["graduation_year"], ""),
-                "mentor_confirmation": fields.get(STUDENT_FIELDS["mentor_confirmation"], ""),
-                "background_shared": fields.get(STUDENT_FIELDS["background_shared"], ""),
-                "expected_meetings": fields.get(STUDENT_FIELDS["expected_meetings"], 0),
-                "completed_meetings": fields.get(STUDENT_FIELDS["completed_meetings"], 0),
-                "notes_summary": fields.get(STUDENT_FIELDS["notes_summary"], ""),
-                "hours_recorded": fields.get(STUDENT_FIELDS["hours_recorded"], ""),
-                "foundation_student": fields.get(STUDENT_FIELDS["foundation_student"], ""),
-                "tuition_paid": fields.get(STUDENT_FIELDS["tuition_paid"], ""),
-                "program_manager_email": unwrap(fields.get(STUDENT_FIELDS["program_manager_email"], "")),
-                "revised_final_paper_due": unwrap(fields.get(STUDENT_FIELDS["revised_final_paper_due"], "")),
-                "student_no_shows": unwrap(fields.get(STUDENT_FIELDS["student_no_shows"], 0), default=0),
-                "reason_for_interest": unwrap(fields.get(STUDENT_FIELDS["reason_for_interest"], ""))
-            })
-        return students
-    except Exception as e:
-        st.error(f"Error fetching students: {e}")
-        return []
+    # Use FIND to search for mentor name in the linked field
+    formula = f"FIND('{mentor_name}', ARRAYJOIN({{Mentor Name}}))"
+    records = tables["students"].all(formula=formula)
+    return [parse_student(record) for record in records]
+
+def deadline_match_key(student_name):
+    """Portion of a student's name that appears in their Deadline Name records"""
+    return student_name.split('|')[0].strip()
+
+def parse_deadline(record):
+    """Convert a deadline table record into the dict used throughout the portal"""
+    fields = record["fields"]
+
+    # Collect submission files
+    submissions = {}
+    for field in SUBMISSION_FIELDS:
+        value = fields.get(field)
+        if value:
+            submissions[field] = value
 
-@st.cache_data(ttl=300)
+    return {
+        "id": record["id"],
+        "name": fields.get(DEADLINE_FIELDS["name"], ""),
+        "type": fields.get(DEADLINE_FIELDS["type"], ""),
+        "due_date": fields.get(DEADLINE_FIELDS["due_date"], ""),
+        "status": fields.get(DEADLINE_FIELDS["status"], ""),
+        "date_submitted": fields.get(DEADLINE_FIELDS["date_submitted"], ""),
+        "submissions": submissions
+    }
+
+def sort_deadlines(deadlines):
+    """Sort deadlines by due date, undated ones last"""
+    deadlines.sort(key=lambda x: x["due_date"] or "9999-99-99")
+    return deadlines
+
+@shared_cache("Error fetching deadlines", default=())
 def get_deadlines_for_student(student_name):
     """Get all deadlines for a specific student"""
     tables = get_tables()
-    try:
-        # Search for student name in Deadline Name field
-        formula = f"FIND('{student_name.split('|')[0].strip()}', {{Deadline Name}})"
-        records = tables["deadlines"].all(formula=formula)
-
-        deadlines = []
-        for record in records:
-            fields = record["fields"]
-
-            # Collect submission files
-            submissions = {}
-            for field in SUBMISSION_FIELDS:
-                value = fields.get(field)
-                if value:
-                    submissions[field] = value
-
-            deadlines.append({
-                "id": record["id"],
-                "name": fields.get(DEADLINE_FIELDS["name"], ""),
-                "type": fields.get(DEADLINE_FIELDS["type"], ""),
-                "due_date": fields.get(DEADLINE_FIELDS["due_date"], ""),
-                "status": fields.get(DEADLINE_FIELDS["status"], ""),
-                "date_submitted": fields.get(DEADLINE_FIELDS["date_submitted"], ""),
-                "submissions": submissions
-            })
-
-        # Sort by due date
-        deadlines.sort(key=lambda x: x["due_date"] or "9999-99-99")
-        return deadlines
-    except Exception as e:
-        st.error(f"Error fetching deadlines: {e}")
-        return []
+    # Search for student name in Deadline Name field
+    formula = f"FIND('{deadline_match_key(student_name)}', {{Deadline Name}})"
+    records = tables["deadlines"].all(formula=formula)
+    return sort_deadlines([parse_deadline(record) for record in records])
 
 def format_duration(value):
     """Format a duration value (seconds from Airtable API) as h:mm"""
@@ -338,7 +531,7 @@ def format_date(date_str):
     if not date_str:
         return "Not set"
     # Handle list values (e.g. from Airtable lookup fields)
-    if isinstance(date_str, list):
+    if isinstance(date_str, (list, tuple)):
         date_str = date_str[0] if date_str else ""
     if not date_str:
         return "Not set"
@@ -355,7 +548,7 @@ def format_datetime_ist(date_str):
     if not date_str:
         return "Not set"
     # Handle list values (e.g. from Airtable lookup fields)
-    if isinstance(date_str, list):
+    if isinstance(date_str, (list, tuple)):
         date_str = date_str[0] if date_str else ""
     if not date_str:
         return "Not set"
@@ -416,6 +609,685 @@ def is_overdue(due_date_str, status):
     except:
         return False
 
+# Attachment cache
+# Airtable attachment URLs expire after a few hours, so submission files are
+# downloaded in the background into a local store: blobs are named by their
+# SHA-256 and an index maps each attachment ID to its blob. The store is bounded
+# by total blob size and evicts the least recently viewed attachments first.
+ATTACHMENT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+ATTACHMENT_DOWNLOAD_WORKERS = 3
+ATTACHMENT_DOWNLOAD_TIMEOUT = 60  # Seconds per HTTP request
+ATTACHMENT_RETRY_AFTER = 300  # Don't retry a failed URL until the loader cache refreshes it
+ATTACHMENT_SKIP_MAX_ENTRIES = 10000  # Failed/oversize attachment IDs remembered
+
+class AttachmentTooLarge(Exception):
+    pass
+
+class AttachmentCache:
+    """Size-bounded, content-addressed local store for Airtable attachments"""
+
+    def __init__(self, root, max_bytes, workers):
+        self.blob_dir = Path(root) / "blobs"
+        self.index_dir = Path(root) / "index"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="attachment-download")
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # attachment_id -> metadata, least recently used first
+        self._blob_refs = {}  # sha256 -> number of attachments sharing the blob
+        self._pending = {}  # attachment_id -> Future
+        self._failed = OrderedDict()  # attachment_id -> retry_after, oldest first
+        self._oversize = OrderedDict()  # attachment_id -> None; never fetched again
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.downloads = 0
+        self.failures = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the index from disk, oldest access first, dropping dangling files"""
+        entries = []
+        for index_file in self.index_dir.glob("*.json"):
+            try:
+                meta = json.loads(index_file.read_text())
+            except ValueError:
+                index_file.unlink(missing_ok=True)
+                continue
+            if not (self.blob_dir / meta["sha256"]).exists():
+                index_file.unlink(missing_ok=True)
+                continue
+            entries.append((index_file.stat().st_mtime, index_file.stem, meta))
+
+        for _, attachment_id, meta in sorted(entries, key=lambda entry: entry[0]):
+            self._add(attachment_id, meta)
+
+        for blob in self.blob_dir.iterdir():
+            if blob.name not in self._blob_refs:
+                blob.unlink(missing_ok=True)  # Orphans and interrupted downloads
+
+    def prefetch(self, attachment):
+        """Queue a background download unless the attachment is cached or in flight"""
+        attachment_id = attachment.get("id")
+        if not attachment_id or not attachment.get("url"):
+            return
+        with self._lock:
+            if attachment_id in self._index or attachment_id in self._pending:
+                return
+            if attachment_id in self._oversize:
+                return
+            # Airtable reports attachment sizes, so skip oversize files without a request
+            if (attachment.get("size") or 0) > self.max_bytes:
+                self._skip(self._oversize, attachment_id, None)
+                return
+            now = time.monotonic()
+            while self._failed and next(iter(self._failed.values())) <= now:
+                self._failed.popitem(last=False)
+            if attachment_id in self._failed:
+                return
+            self.misses += 1
+            self._pending[attachment_id] = self._executor.submit(self._download, dict(attachment))
+
+    def read(self, attachment_id):
+        """Return a cached attachment's bytes, counting a hit, or None (a miss)"""
+        with self._lock:
+            meta = self._index.get(attachment_id)
+            if not meta:
+                self.misses += 1
+                return None
+            self._index.move_to_end(attachment_id)
+            (self.index_dir / f"{attachment_id}.json").touch()
+        try:
+            data = (self.blob_dir / meta["sha256"]).read_bytes()
+        except OSError:
+            data = None  # Evicted between lookup and read
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def is_cached(self, attachment_id):
+        with self._lock:
+            return attachment_id in self._index
+
+    def is_pending(self, attachment_id):
+        with self._lock:
+            return attachment_id in self._pending
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "blobs": len(self._blob_refs),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "downloads": self.downloads,
+                "failures": self.failures,
+                "evictions": self.evictions,
+                "pending": len(self._pending)
+            }
+
+    def _download(self, attachment):
+        attachment_id = attachment["id"]
+        part = self.blob_dir / f".{attachment_id}.{uuid.uuid4().hex}.part"
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with urllib.request.urlopen(attachment["url"], timeout=ATTACHMENT_DOWNLOAD_TIMEOUT) as response:
+                if int(response.headers.get("Content-Length") or 0) > self.max_bytes:
+                    raise AttachmentTooLarge()
+                with part.open("wb") as f:
+                    while chunk := response.read(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise AttachmentTooLarge()
+                        digest.update(chunk)
+                        f.write(chunk)
+
+            meta = {
+                "sha256": digest.hexdigest(),
+                "filename": attachment.get("filename", "Download"),
+                "type": attachment.get("type", ""),
+                "size": size
+            }
+            with self._lock:
+                if meta["sha256"] in self._blob_refs:
+                    part.unlink()  # Same content already stored under another attachment ID
+                else:
+                    self._evict(size)
+                    part.replace(self.blob_dir / meta["sha256"])
+                (self.index_dir / f"{attachment_id}.json").write_text(json.dumps(meta))
+                self._add(attachment_id, meta)
+                self.downloads += 1
+        except AttachmentTooLarge:
+            part.unlink(missing_ok=True)
+            with self._lock:
+                self.failures += 1
+                self._skip(self._oversize, attachment_id, None)
+        except Exception:
+            part.unlink(missing_ok=True)
+            with self._lock:
+                self.failures += 1
+                self._skip(self._failed, attachment_id, time.monotonic() + ATTACHMENT_RETRY_AFTER)
+        finally:
+            with self._lock:
+                self._pending.pop(attachment_id, None)
+
+    def _skip(self, entries, attachment_id, value):
+        """Remember an attachment not to fetch, bounded to the most recent IDs"""
+        entries.pop(attachment_id, None)
+        entries[attachment_id] = value
+        while len(entries) > ATTACHMENT_SKIP_MAX_ENTRIES:
+            entries.popitem(last=False)
+
+    def _add(self, attachment_id, meta):
+        sha = meta["sha256"]
+        if sha not in self._blob_refs:
+            self._blob_refs[sha] = 0
+            self.total_bytes += meta["size"]
+        self._blob_refs[sha] += 1
+        self._index[attachment_id] = meta
+
+    def _evict(self, incoming_bytes):
+        """Drop least recently used attachments until incoming_bytes fits"""
+        while self._index and self.total_bytes + incoming_bytes > self.max_bytes:
+            attachment_id, meta = self._index.popitem(last=False)
+            (self.index_dir / f"{attachment_id}.json").unlink(missing_ok=True)
+            self.evictions += 1
+            sha = meta["sha256"]
+            self._blob_refs[sha] -= 1
+            if not self._blob_refs[sha]:
+                del self._blob_refs[sha]
+                (self.blob_dir / sha).unlink(missing_ok=True)
+                self.total_bytes -= meta["size"]
+
+@st.cache_resource
+def get_attachment_cache():
+    root = st.secrets.get("ATTACHMENT_CACHE_DIR", ".attachment_cache")
+    return AttachmentCache(root, ATTACHMENT_CACHE_MAX_BYTES, ATTACHMENT_DOWNLOAD_WORKERS)
+
+def iter_attachments(deadlines):
+    """Yield every attachment dict in the deadlines' submission fields"""
+    for deadline in deadlines:
+        for value in deadline.get("submissions", {}).values():
+            if isinstance(value, (list, tuple)):
+                for attachment in value:
+                    if isinstance(attachment, Mapping):
+                        yield attachment
+
+# Deadline Digest
+# One email per mentor listing overdue and soon-due deadlines for their confirmed
+# students. Built from a single scan of the mentor, student and deadline tables and
+# sent through Resend's batch API, with a per-day JSONL log so reruns only send
+# what is still missing.
+DIGEST_UPCOMING_DAYS = 7
+DIGEST_BATCH_SIZE = 100  # Resend batch send limit
+DIGEST_MAX_WORKERS = 2
+DIGEST_REQUESTS_PER_SECOND = 2  # Resend default rate limit
+DIGEST_MAX_RETRIES = 3
+
+def is_due_soon(due_date_str, status, days=DIGEST_UPCOMING_DAYS):
+    """Check if an unsubmitted, not yet overdue deadline falls within the next few days"""
+    if status == "Submitted" or is_overdue(due_date_str, status):
+        return False
+    if not due_date_str:
+        return False
+    try:
+        due_date = datetime.strptime(due_date_str, "%Y-%m-%d")
+        return due_date <= datetime.now() + timedelta(days=days)
+    except (ValueError, TypeError):
+        return False
+
+def build_mentor_digests():
+    """Compute every mentor's overdue and upcoming deadlines in one pass over the tables"""
+    tables = get_tables()
+
+    # "Mentor Name" on the student table may be a linked field (record IDs) or a
+    # lookup of names, so mentors are indexed both ways
+    mentors_by_id = {}
+    mentors_by_name = {}
+    for record in tables["mentors"].all():
+        fields = record["fields"]
+        name = unwrap(fields.get("Name") or fields.get("Mentor Name", "")).strip()
+        if fields.get("Email"):
+            mentor = {"name": name, "email": fields["Email"]}
+            mentors_by_id[record["id"]] = mentor
+            if name:
+                mentors_by_name[name] = mentor
+
+    students = {}
+    student_mentors = {}
+    for record in tables["students"].all():
+        student = parse_student(record)
+        # Deadlines are only shown to mentors for confirmed students
+        if student["mentor_confirmation"] != "Yes":
+            continue
+        mentor_names = record["fields"].get(STUDENT_FIELDS["mentor"], [])
+        if isinstance(mentor_names, str):
+            mentor_names = [mentor_names]
+        students[student["id"]] = student
+        student_mentors[student["id"]] = [name.strip() for name in mentor_names if name]
+
+    # Use the linked student record when there is one; only unlinked deadlines
+    # fall back to the same name match the per-student loader uses
+    match_keys = {}
+    for student_id, student in students.items():
+        key = deadline_match_key(student["name"])
+        if key:
+            match_keys[key] = student_id
+
+    student_deadlines = {student_id: [] for student_id in students}
+    for record in tables["deadlines"].all():
+        deadline = parse_deadline(record)
+        linked = [
+            value for value in record["fields"].get(DEADLINE_FIELDS["student_link"], [])
+            if isinstance(value, str) and value.startswith("rec")
+        ]
+        if linked:
+            # A deadline linked only to unconfirmed (or other mentors') students is
+            # dropped, never name-matched onto someone else's student
+            student_ids = [student_id for student_id in linked if student_id in students]
+        else:
+            student_ids = [student_id for key, student_id in match_keys.items() if key in deadline["name"]]
+        for student_id in student_ids:
+            student_deadlines[student_id].append(deadline)
+
+    digests = {}
+    for student_id, student in students.items():
+        overdue = []
+        upcoming = []
+        for deadline in sort_deadlines(student_deadlines[student_id]):
+            if is_overdue(deadline["due_date"], deadline["status"]):
+                overdue.append(deadline)
+            elif is_due_soon(deadline["due_date"], deadline["status"]):
+                upcoming.append(deadline)
+        if not overdue and not upcoming:
+            continue
+
+        for mentor_ref in student_mentors[student_id]:
+            mentor = mentors_by_id.get(mentor_ref) or mentors_by_name.get(mentor_ref)
+            if not mentor:
+                continue
+            digest = digests.setdefault(mentor["email"], {
+                "name": mentor["name"] or mentor_ref,
+                "email": mentor["email"],
+                "students": []
+            })
+            digest["students"].append({"name": student["name"], "overdue": overdue, "upcoming": upcoming})
+
+    return list(digests.values())
+
+def render_digest_email(digest):
+    """Render a mentor's digest as a Resend email payload"""
+    overdue_count = sum(len(s["overdue"]) for s in digest["students"])
+    upcoming_count = sum(len(s["upcoming"]) for s in digest["students"])
+    base_url = st.secrets.get("APP_URL", "http://localhost:8501")
+
+    sections = []
+    for student in digest["students"]:
+        items = [
+            f'<li style="color: #991B1B;">⚠️ {html.escape(d["type"] or "Deadline")} &mdash; '
+            f'overdue since {format_date(d["due_date"])}</li>'
+            for d in student["overdue"]
+        ] + [
+            f'<li>📅 {html.escape(d["type"] or "Deadline")} &mdash; due {format_date(d["due_date"])}</li>'
+            for d in student["upcoming"]
+        ]
+        sections.append(
+            f'<h3 style="color: #1E3A5F; margin-bottom: 4px;">{html.escape(student["name"])}</h3>'
+            f'<ul style="margin-top: 4px;">{"".join(items)}</ul>'
+        )
+
+    return {
+        "from": st.secrets.get("FROM_EMAIL", "Mentor Portal <onboarding@resend.dev>"),
+        "to": [digest["email"]],
+        "subject": f"Student deadlines: {overdue_count} overdue, {upcoming_count} due soon",
+        "html": f"""
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <h2 style="color: #1E3A5F;">Your Student Deadline Digest</h2>
+            <p>Hi {html.escape(digest["name"])},</p>
+            <p>Here are your confirmed students' overdue deadlines and those due in the next {DIGEST_UPCOMING_DAYS} days:</p>
+            {"".join(sections)}
+            <p style="margin: 30px 0;">
+                <a href="{base_url}"
+                   style="background: linear-gradient(135deg, #4F46E5 0%, #7C3AED 100%);
+                          color: white;
+                          padding: 12px 30px;
+                          text-decoration: none;
+                          border-radius: 6px;
+                          display: inline-block;">
+                    Open Mentor Portal
+                </a>
+            </p>
+        </div>
+        """
+    }
+
+class ResendTransport:
+    """Sends digest emails through Resend's batch API"""
+
+    def __init__(self):
+        resend.api_key = st.secrets["RESEND_API_KEY"]
+        # Older SDKs have no options argument, so a resent batch can't be deduplicated
+        self.idempotent = "options" in inspect.signature(resend.Batch.send).parameters
+
+    def send_batch(self, messages, idempotency_key):
+        if self.idempotent:
+            response = resend.Batch.send(messages, options={"idempotency_key": idempotency_key})
+        else:
+            response = resend.Batch.send(messages)
+        data = response.get("data", []) if isinstance(response, Mapping) else response
+        return [item.get("id", "") for item in data]
+
+class StubTransport:
+    """Writes digest emails to a local outbox directory instead of sending them"""
+
+    idempotent = True
+
+    def __init__(self, outbox_dir):
+        self.outbox_dir = Path(outbox_dir)
+        self.outbox_dir.mkdir(parents=True, exist_ok=True)
+
+    def send_batch(self, messages, idempotency_key):
+        message_ids = []
+        for i, message in enumerate(messages):
+            # Keyed like Resend's idempotency: a resent batch overwrites, never duplicates
+            message_id = f"stub-{idempotency_key[-16:]}-{i}"
+            (self.outbox_dir / f"{message_id}.json").write_text(json.dumps(message, indent=2))
+            message_ids.append(message_id)
+        return message_ids
+
+class RateLimiter:
+    """Spaces calls out across threads to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+class DigestSendLog:
+    """Append-only JSONL log of digest sends, used to resume an interrupted run"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def sent_emails(self):
+        if not self.path.exists():
+            return set()
+        sent = set()
+        for line in self.path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Tolerate a line truncated by a crash mid-write
+            # "unconfirmed" sends may have been delivered, so they are never resent
+            if entry.get("status") in ("sent", "unconfirmed"):
+                sent.add(entry["email"])
+        return sent
+
+    def record(self, email, status, message_id="", error=""):
+        entry = {
+            "email": email,
+            "status": status,
+            "message_id": message_id,
+            "error": error,
+            "at": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock, self.path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+def get_digest_dir():
+    return Path(st.secrets.get("DIGEST_DATA_DIR", ".digest"))
+
+def digest_idempotency_key(run_id, batch):
+    """Stable key for a batch, so resending the same batch on the same day is a no-op"""
+    emails = ",".join(sorted(digest["email"] for digest in batch))
+    return f"digest-{run_id}-" + hashlib.sha256(emails.encode()).hexdigest()
+
+def send_digests(digests, transport, send_log, run_id, on_progress=None):
+    """Send digests in batches with bounded concurrency, skipping mentors already sent.
+
+    A batch that raised may still have been accepted, so it is only retried when
+    the transport deduplicates by idempotency key. Otherwise it is logged as
+    "unconfirmed" and never resent automatically.
+    """
+    already_sent = send_log.sent_emails()
+    pending = [d for d in digests if d["email"] not in already_sent]
+    batches = [pending[i:i + DIGEST_BATCH_SIZE] for i in range(0, len(pending), DIGEST_BATCH_SIZE)]
+    limiter = RateLimiter(DIGEST_REQUESTS_PER_SECOND)
+    attempts = DIGEST_MAX_RETRIES if transport.idempotent else 1
+
+    def send_batch(batch):
+        messages = [render_digest_email(digest) for digest in batch]
+        idempotency_key = digest_idempotency_key(run_id, batch)
+        error = ""
+        for attempt in range(attempts):
+            limiter.wait()
+            try:
+                message_ids = transport.send_batch(messages, idempotency_key)
+            except Exception as e:
+                error = str(e)
+                if attempt < attempts - 1:
+                    time.sleep(2 ** attempt)
+                continue
+            for i, digest in enumerate(batch):
+                send_log.record(digest["email"], "sent", message_ids[i] if i < len(message_ids) else "")
+            return len(batch), 0, 0
+        if transport.idempotent:
+            for digest in batch:
+                send_log.record(digest["email"], "failed", error=error)
+            return 0, len(batch), 0
+        for digest in batch:
+            send_log.record(digest["email"], "unconfirmed", error=error)
+        return 0, 0, len(batch)
+
+    result = {"total": len(digests), "skipped": len(digests) - len(pending), "sent": 0, "failed": 0, "unconfirmed": 0}
+    with ThreadPoolExecutor(max_workers=DIGEST_MAX_WORKERS) as executor:
+        for done, (sent, failed, unconfirmed) in enumerate(executor.map(send_batch, batches), start=1):
+            result["sent"] += sent
+            result["failed"] += failed
+            result["unconfirmed"] += unconfirmed
+            if on_progress:
+                on_progress(done / len(batches))
+    return result
+
+@st.cache_resource
+def get_digest_run_lock():
+    return threading.Lock()
+
+def run_deadline_digest(dry_run):
+    """Build and send today's digest run, reporting progress in the app"""
+    # Two runs reading the send log at once would both email every mentor
+    run_lock = get_digest_run_lock()
+    if not run_lock.acquire(blocking=False):
+        st.warning("A digest run is already in progress. Try again once it finishes.")
+        return
+    try:
+        send_deadline_digest(dry_run)
+    finally:
+        run_lock.release()
+
+def send_deadline_digest(dry_run):
+    digest_dir = get_digest_dir()
+    run_id = datetime.now().strftime("%Y-%m-%d")
+    if dry_run:
+        transport = StubTransport(digest_dir / "outbox" / run_id)
+        send_log = DigestSendLog(digest_dir / f"digest-{run_id}-dry-run.jsonl")
+    else:
+        transport = ResendTransport()
+        send_log = DigestSendLog(digest_dir / f"digest-{run_id}.jsonl")
+
+    with st.spinner("Loading students and deadlines..."):
+        try:
+            digests = build_mentor_digests()
+        except Exception as e:
+            st.error(f"Error building digests: {e}")
+            return
+
+    progress = st.progress(0.0)
+    result = send_digests(digests, transport, send_log, run_id, on_progress=progress.progress)
+    progress.progress(1.0)
+    st.success(
+        f"{result['sent']} sent, {result['skipped']} already sent today, "
+        f"{result['failed']} failed ({result['total']} mentors with deadlines)"
+    )
+    if result["failed"]:
+        st.warning("Run the digest again to retry failed sends.")
+    if result["unconfirmed"]:
+        st.warning(
+            f"{result['unconfirmed']} sends errored and may or may not have been delivered. "
+            f"They won't be retried; check the Resend dashboard and {send_log.path}."
+        )
+
+# Roster search
+# A per-mentor index over the loaded student and deadline records, cached like any
+# other loader result. Prefix matches come from a sorted token vocabulary and
+# substring matches from a trigram index, so searching never touches Airtable
+# once the index is built.
+ROSTER_DEADLINE_QUERY_CHUNK = 25  # Students per Airtable formula when loading a roster's deadlines
+
+def search_tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def formula_string(value):
+    """Quote a value as an Airtable formula string literal"""
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def searchable_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value if v)
+    return str(value) if value else ""
+
+def fetch_roster_deadlines(students):
+    """Load deadlines for a whole roster in a few batched queries, grouped by student ID"""
+    tables = get_tables()
+    match_keys = {}
+    for student in students:
+        key = deadline_match_key(student["name"])
+        if key:
+            match_keys.setdefault(key, []).append(student["id"])
+
+    grouped = {student["id"]: [] for student in students}
+    keys = list(match_keys)
+    for i in range(0, len(keys), ROSTER_DEADLINE_QUERY_CHUNK):
+        chunk = keys[i:i + ROSTER_DEADLINE_QUERY_CHUNK]
+        formula = "OR(" + ", ".join(f"FIND({formula_string(key)}, {{Deadline Name}})" for key in chunk) + ")"
+        for record in tables["deadlines"].all(formula=formula):
+            deadline = parse_deadline(record)
+            for key in chunk:
+                if key in deadline["name"]:
+                    for student_id in match_keys[key]:
+                        grouped[student_id].append(deadline)
+    return grouped
+
+@shared_cache("Error building student search index")
+def get_roster_index(mentor_name):
+    """Build a search index over a mentor's students and their deadlines"""
+    students = get_students_for_mentor(mentor_name)
+    roster_deadlines = fetch_roster_deadlines(students)
+
+    index = {"ids": [], "text": {}, "tokens": {}, "trigrams": {}, "overdue": [], "due_soon": []}
+    for student in students:
+        student_id = student["id"]
+        deadlines = roster_deadlines.get(student_id, [])
+        parts = [student["name"], student["research_area"], student["city"], student["graduation_year"]]
+        parts += [deadline["type"] for deadline in deadlines]
+        text = " | ".join(filter(None, map(searchable_text, parts))).lower()
+
+        index["ids"].append(student_id)
+        index["text"][student_id] = text
+        for token in set(search_tokens(text)):
+            index["tokens"].setdefault(token, []).append(student_id)
+        for gram in trigrams(text):
+            index["trigrams"].setdefault(gram, []).append(student_id)
+        if any(is_overdue(d["due_date"], d["status"]) for d in deadlines):
+            index["overdue"].append(student_id)
+        if any(is_due_soon(d["due_date"], d["status"]) for d in deadlines):
+            index["due_soon"].append(student_id)
+
+    index["vocabulary"] = sorted(index["tokens"])
+    return index
+
+def match_term(index, term):
+    """IDs of students with a token starting with term, or containing it anywhere"""
+    found = set()
+    vocabulary = index["vocabulary"]
+    i = bisect_left(vocabulary, term)
+    while i < len(vocabulary) and vocabulary[i].startswith(term):
+        found.update(index["tokens"][vocabulary[i]])
+        i += 1
+
+    if len(term) >= 3:
+        candidates = None
+        for gram in trigrams(term):
+            ids = index["trigrams"].get(gram, ())
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+            if not candidates:
+                break
+        found.update(student_id for student_id in candidates or () if term in index["text"][student_id])
+    return found
+
+def search_roster(index, query="", overdue=False, due_soon=False):
+    """Return IDs of students matching every query term and filter, in roster order"""
+    matches = set(index["ids"])
+    for term in search_tokens(query):
+        matches &= match_term(index, term)
+    if overdue:
+        matches &= set(index["overdue"])
+    if due_soon:
+        matches &= set(index["due_soon"])
+    return [student_id for student_id in index["ids"] if student_id in matches]
+
+def show_student_search(students, key):
+    """Search box and deadline filters over the roster; returns the matching students"""
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        query = st.text_input(
+            "Search students",
+            placeholder="Search by name, research area, city or deadline type",
+            label_visibility="collapsed",
+            key=f"{key}_query"
+        )
+    with col2:
+        overdue = st.checkbox("Has overdue deadline", key=f"{key}_overdue")
+    with col3:
+        due_soon = st.checkbox(f"Due in {DIGEST_UPCOMING_DAYS} days", key=f"{key}_due_soon")
+
+    if not (query.strip() or overdue or due_soon):
+        return students
+
+    index = get_roster_index(st.session_state.mentor_name)
+    if index is None:
+        # The loader has already shown the error; don't present the whole roster as matches
+        return []
+
+    started = time.perf_counter()
+    matching_ids = set(search_roster(index, query, overdue, due_soon))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    results = [s for s in students if s["id"] in matching_ids]
+    st.caption(f"{len(results)} of {len(students)} students match · {elapsed_ms:.1f} ms")
+    return results
+
 # Check for magic link token in URL
 def check_magic_link_token():
     query_params = st.query_params
@@ -436,6 +1308,149 @@ def check_magic_link_token():
             st.error("This login link has expired or is invalid. Please request a new one.")
             st.query_params.clear()
 
+# Login abuse controls
+# Every login/preview submit for a new email is a live Airtable query, and every
+# successful one sends a Resend email, so both are throttled process-wide.
+LOGIN_SESSION_MAX_ATTEMPTS = 5  # Magic-link requests per session...
+LOGIN_SESSION_WINDOW = 600  # ...per 10 minutes
+MAGIC_LINK_MIN_INTERVAL = 60  # Seconds between requests for the same email
+MAGIC_LINK_MAX_PER_HOUR = 5  # Magic-link emails sent to one address per hour
+UNKNOWN_EMAIL_TTL = 300  # How long an unknown email skips Airtable
+UNKNOWN_EMAIL_MAX_ENTRIES = 10000
+
+class LoginGuard:
+    """Process-wide per-email throttling and negative cache for login lookups"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._unknown = OrderedDict()  # email -> expires_at, oldest first
+        self._last_request = OrderedDict()  # email -> last request time, oldest first
+        self._sends = OrderedDict()  # email -> send times in the past hour, least recent first
+        self.counters = {
+            "airtable_lookups": 0,
+            "negative_hits": 0,
+            "session_throttled": 0,
+            "email_throttled": 0,
+            "send_capped": 0,
+            "links_sent": 0
+        }
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def is_unknown(self, email):
+        with self._lock:
+            self._prune(time.monotonic())
+            return email in self._unknown
+
+    def remember_unknown(self, email):
+        with self._lock:
+            self._unknown.pop(email, None)
+            self._unknown[email] = time.monotonic() + UNKNOWN_EMAIL_TTL
+            while len(self._unknown) > UNKNOWN_EMAIL_MAX_ENTRIES:
+                self._unknown.popitem(last=False)
+
+    def allow_request(self, email):
+        """Record a magic-link request, refusing it if the email asked too recently"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if email in self._last_request:
+                return False
+            self._last_request[email] = now
+            return True
+
+    def forget_request(self, email):
+        """Undo allow_request when the lookup failed, so the mentor can retry at once"""
+        with self._lock:
+            self._last_request.pop(email, None)
+
+    def allow_send(self, email):
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            # _prune only trims the least recently sent-to emails, so drop this
+            # email's stale sends before counting
+            if email in self._sends:
+                self._sends[email] = [t for t in self._sends[email] if t > now - 3600]
+            return len(self._sends.get(email, [])) < MAGIC_LINK_MAX_PER_HOUR
+
+    def record_send(self, email):
+        with self._lock:
+            sends = self._sends.pop(email, [])
+            sends.append(time.monotonic())
+            self._sends[email] = sends
+            self.counters["links_sent"] += 1
+
+    def stats(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            return dict(
+                self.counters,
+                unknown_emails=len(self._unknown),
+                throttled_emails=len(self._last_request),
+                emails_sent_to=len(self._sends)
+            )
+
+    def _prune(self, now):
+        while self._unknown and next(iter(self._unknown.values())) <= now:
+            self._unknown.popitem(last=False)
+        while self._last_request and next(iter(self._last_request.values())) <= now - MAGIC_LINK_MIN_INTERVAL:
+            self._last_request.popitem(last=False)
+        while self._sends:
+            email, sends = next(iter(self._sends.items()))
+            recent = [t for t in sends if t > now - 3600]
+            if recent:
+                self._sends[email] = recent
+                break
+            self._sends.popitem(last=False)
+
+@st.cache_resource
+def get_login_guard():
+    return LoginGuard()
+
+def normalize_email(email):
+    return email.strip().lower()
+
+def allow_session_attempt():
+    """Sliding-window limit on magic-link requests from this browser session"""
+    now = time.time()
+    attempts = [t for t in st.session_state.login_attempts if now - t < LOGIN_SESSION_WINDOW]
+    allowed = len(attempts) < LOGIN_SESSION_MAX_ATTEMPTS
+    if allowed:
+        attempts.append(now)
+    st.session_state.login_attempts = attempts
+    return allowed
+
+def guarded_mentor_lookup(email, magic_link=False):
+    """Look up a mentor from the login or preview form behind the abuse controls.
+
+    Returns (mentor, error_message); both None means the email is not a mentor.
+    Only a lookup that succeeded and found nothing is negative-cached.
+    """
+    guard = get_login_guard()
+    if magic_link:
+        if not allow_session_attempt():
+            guard.count("session_throttled")
+            return None, "Too many attempts. Please wait a few minutes and try again."
+        if not guard.allow_request(email):
+            guard.count("email_throttled")
+            return None, "A login link was just requested for this email. Please check your inbox or try again in a minute."
+    if guard.is_unknown(email):
+        guard.count("negative_hits")
+        return None, None
+    guard.count("airtable_lookups")
+    try:
+        mentor = get_mentor_by_email(email, raise_errors=True)
+    except Exception as e:
+        if magic_link:
+            guard.forget_request(email)
+        return None, f"Error fetching mentor: {e}"
+    if mentor is None:
+        guard.remember_unknown(email)
+    return mentor, None
+
 # LOGIN PAGE
 def show_login_page():
     st.markdown('<p class="main-header">Mentor Portal</p>', unsafe_allow_html=True)
@@ -460,13 +1475,20 @@ def show_login_page():
                 submitted = st.form_submit_button("Send Magic Link", use_container_width=True)
 
                 if submitted and email:
-                    mentor = get_mentor_by_email(email)
-                    if mentor:
-                        if send_magic_link(mentor["email"], mentor["name"]):
-                            st.session_state.magic_link_sent = True
-                            st.rerun()
-                    else:
+                    email = normalize_email(email)
+                    mentor, error = guarded_mentor_lookup(email, magic_link=True)
+                    guard = get_login_guard()
+                    if error:
+                        st.error(error)
+                    elif not mentor:
                         st.error("Email not found. Please check your email address.")
+                    elif not guard.allow_send(email):
+                        guard.count("send_capped")
+                        st.error("Too many login links have been sent to this email. Please try again later.")
+                    elif send_magic_link(mentor["email"], mentor["name"]):
+                        guard.record_send(email)
+                        st.session_state.magic_link_sent = True
+                        st.rerun()
 
         # Team preview access - small link that gates behind admin key
         st.markdown("---")
@@ -478,8 +1500,10 @@ def show_login_page():
                 preview_submitted = st.form_submit_button("Preview as Mentor", use_container_width=True)
 
                 if preview_submitted:
-                    mentor = get_mentor_by_email(preview_email)
-                    if mentor:
+                    mentor, error = guarded_mentor_lookup(normalize_email(preview_email))
+                    if error:
+                        st.error(error)
+                    elif mentor:
                         st.session_state.authenticated = True
                         st.session_state.mentor_name = mentor["name"]
                         st.session_state.mentor_email = mentor["email"]
@@ -500,6 +1524,68 @@ def show_login_page():
                         else:
                             st.error("Invalid admin key.")
 
+# ADMIN PANEL (Preview Mode only)
+def show_admin_panel():
+    with st.expander("🛠️ Admin"):
+        st.markdown("**Loader Cache**")
+        stats = get_loader_cache().stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Entries", f"{stats['entries']} / {LOADER_CACHE_MAX_ENTRIES}")
+        col2.metric("Size", format_bytes(stats["bytes"]))
+        st.caption(
+            f"{stats['hits']} hits · {stats['misses']} misses · {stats['evictions']} evictions "
+            f"(limit {format_bytes(LOADER_CACHE_MAX_BYTES)})"
+        )
+
+        st.markdown("---")
+        st.markdown("**Attachment Cache**")
+        attachment_stats = get_attachment_cache().stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Hit Rate", f"{attachment_stats['hit_rate']:.0%}")
+        col2.metric("Size", format_bytes(attachment_stats["bytes"]))
+        st.caption(
+            f"{attachment_stats['entries']} attachments in {attachment_stats['blobs']} files "
+            f"(limit {format_bytes(ATTACHMENT_CACHE_MAX_BYTES)}) · "
+            f"{attachment_stats['hits']} hits · {attachment_stats['misses']} misses · "
+            f"{attachment_stats['downloads']} downloaded · {attachment_stats['pending']} pending · "
+            f"{attachment_stats['failures']} failed · {attachment_stats['evictions']} evicted"
+        )
+
+        st.markdown("---")
+        st.markdown("**Login Protection**")
+        login_stats = get_login_guard().stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Airtable Lookups", login_stats["airtable_lookups"])
+        col2.metric("Links Sent", login_stats["links_sent"])
+        st.caption(
+            f"{login_stats['negative_hits']} negative-cache hits "
+            f"({login_stats['unknown_emails']} unknown emails cached) · "
+            f"{login_stats['session_throttled']} session throttled · "
+            f"{login_stats['email_throttled']} email throttled · "
+            f"{login_stats['send_capped']} hourly send cap"
+        )
+
+        st.markdown("---")
+        st.markdown("**Profiler**")
+        remaining = st.session_state.profile_reruns_remaining
+        if remaining:
+            st.caption(f"Profiling the next {remaining} rerun{'s' if remaining != 1 else ''}")
+            if st.button("⏹️ Stop Profiling"):
+                st.session_state.profile_reruns_remaining = 0
+                st.rerun()
+        else:
+            reruns = st.number_input("Reruns to profile", min_value=1, max_value=PROFILE_MAX_RERUNS, value=3)
+            if st.button("⏺️ Profile Next Reruns"):
+                st.session_state.profile_reruns_remaining = reruns
+                st.rerun()
+
+        st.markdown("---")
+        st.markdown("**Deadline Digest**")
+        st.caption(f"Emails every mentor their overdue deadlines and those due in the next {DIGEST_UPCOMING_DAYS} days")
+        dry_run = st.checkbox("Dry run (write emails to local outbox)", value=True, key="digest_dry_run")
+        if st.button("📨 Send Deadline Digests"):
+            run_deadline_digest(dry_run)
+
 # MAIN DASHBOARD
 def show_dashboard():
     # Sidebar
@@ -509,6 +1595,7 @@ def show_dashboard():
 
         if st.session_state.is_preview:
             st.warning("👁️ Preview Mode")
+            show_admin_panel()
 
         st.markdown("---")
 
@@ -521,7 +1608,7 @@ def show_dashboard():
         st.markdown("---")
 
         if st.button("🔄 Refresh Data"):
-            st.cache_data.clear()
+            get_loader_cache().clear()
             st.rerun()
 
         if st.button("🚪 Logout"):
@@ -547,6 +1634,10 @@ def show_dashboard():
     else:
         show_confirmed_students(students)
 
+    if st.session_state.is_preview and st.session_state.profiles:
+        st.markdown("---")
+        show_profile_report()
+
 # VIEW A: ASSIGNED STUDENTS
 def show_assigned_students(students):
     st.markdown('<p class="main-header">Assigned Students</p>', unsafe_allow_html=True)
@@ -564,10 +1655,16 @@ def show_assigned_students(students):
 
     st.markdown(f"**Your Assigned Students** — {len(students)} student{'s' if len(students) != 1 else ''}")
 
+    # Search narrows the roster, then the selectbox picks within the matches
+    matches = show_student_search(students, key="assigned_search")
+    if not matches:
+        st.info("No students match your search.")
+        return
+
     # Student filter
-    student_names = ["All Students"] + [s["name"] for s in students]
+    student_names = ["All Students"] + [s["name"] for s in matches]
     selected = st.selectbox("Filter by student", student_names, label_visibility="collapsed", key="assigned_filter")
-    filtered = students if selected == "All Students" else [s for s in students if s["name"] == selected]
+    filtered = matches if selected == "All Students" else [s for s in matches if s["name"] == selected]
 
     for student in filtered:
         with st.expander(student["name"]):
@@ -612,11 +1709,16 @@ def show_confirmed_students(students):
         st.info("No confirmed students yet. Students will appear here once they confirm the mentor match.")
         return
 
+    matches = show_student_search(confirmed_students, key="confirmed_search")
+    if not matches:
+        st.info("No students match your search.")
+        return
+
     # Student selector
-    student_names = [s["name"] for s in confirmed_students]
+    student_names = [s["name"] for s in matches]
     selected_student_name = st.selectbox("Select Student", student_names)
 
-    selected_student = next((s for s in confirmed_students if s["name"] == selected_student_name), None)
+    selected_student = next((s for s in matches if s["name"] == selected_student_name), None)
 
     if not selected_student:
         return
@@ -735,11 +1837,47 @@ def show_student_deadlines(student):
 
             st.markdown("---")
 
+def show_attachment(cache, attachment, key):
+    """Offer a cached attachment for download, falling back to its Airtable URL.
+
+    Blob bytes are only read when the mentor asks for a file, so reruns of the
+    Confirmed Students view don't load every PDF into memory.
+    """
+    url = attachment.get("url", "")
+    filename = attachment.get("filename", "Download")
+    attachment_id = attachment.get("id")
+
+    if cache.is_cached(attachment_id):
+        if st.button(f"📎 {filename}", key=key):
+            data = cache.read(attachment_id)
+            if data is not None:
+                st.download_button(
+                    f"⬇️ Save {filename}",
+                    data,
+                    file_name=filename,
+                    mime=attachment.get("type") or None,
+                    key=f"{key}_download"
+                )
+                return
+            st.caption("The cached copy was just evicted; use the link below.")
+        else:
+            return
+
+    if url:
+        st.markdown(f"📎 [{filename}]({url})")
+        if cache.is_pending(attachment_id):
+            st.caption("Preparing a cached copy...")
+
 def show_student_submissions(student):
     st.markdown("### Submission Files")
 
     deadlines = get_deadlines_for_student(student["name"])
 
+    # Queue downloads in the background; the page never waits on them
+    cache = get_attachment_cache()
+    for attachment in iter_attachments(deadlines):
+        cache.prefetch(attachment)
+
     has_submissions = False
 
     for deadline in deadlines:
@@ -750,14 +1888,11 @@ def show_student_submissions(student):
                 st.markdown(f"**{deadline['type']}**")
 
                 # Handle different types of submission values
-                if isinstance(value, list):
+                if isinstance(value, (list, tuple)):
                     # Attachments are usually a list of dicts with url, filename
-                    for attachment in value:
-                        if isinstance(attachment, dict):
-                            url = attachment.get("url", "")
-                            filename = attachment.get("filename", "Download")
-                            if url:
-                                st.markdown(f"📎 [{filename}]({url})")
+                    for i, attachment in enumerate(value):
+                        if isinstance(attachment, Mapping):
+                            show_attachment(cache, attachment, key=f"attachment_{deadline['id']}_{field_name}_{i}")
                         else:
                             st.markdown(f"📎 {attachment}")
                 elif isinstance(value, str) and value.startswith("http"):
@@ -770,8 +1905,212 @@ def show_student_submissions(student):
     if not has_submissions:
         st.info("No submissions available yet.")
 
+# Rerun profiler
+# Samples the script thread's stack while main() runs, so a slow dashboard can be
+# broken down by where the time went. Each sample is weighted by the wall time since
+# the previous one: the sampler needs the GIL, so it wakes late during CPU-bound
+# code and on time during I/O, and equal weights would under-report the former.
+# Samples are folded into "a;b;c" stacks (the format flamegraph.pl and speedscope
+# read, weighted in microseconds) and saved under PROFILE_DIR.
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILE_MAX_RERUNS = 20
+PROFILE_MAX_SAVED = 50  # Profile files kept on disk
+PROFILE_FLAME_MAX_DEPTH = 16
+PROFILE_FLAME_MIN_SHARE = 0.01  # Hide frames below 1% of samples
+
+PROFILE_CATEGORY_COLORS = {
+    "Airtable I/O": "#FCA5A5",
+    "Formatting": "#FCD34D",
+    "Streamlit": "#A5B4FC",
+    "Email": "#F9A8D4",
+    "App code": "#86EFAC"
+}
+
+def profile_category(code):
+    """Category a frame's time is attributed to, or None to defer to its caller"""
+    path = Path(code.co_filename).parts
+    if "pyairtable" in path:
+        return "Airtable I/O"
+    if "resend" in path:
+        return "Email"
+    if "streamlit" in path:
+        return "Streamlit"
+    if code.co_filename == __file__ and code.co_name.startswith("format_"):
+        return "Formatting"
+    return None
+
+class RerunProfiler:
+    """Samples the calling thread's stack below root_code until stopped"""
+
+    def __init__(self, root_code, interval=PROFILE_SAMPLE_INTERVAL):
+        self.root_code = root_code
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()  # folded stack -> seconds
+        self.categories = Counter()  # category -> seconds
+        self.samples = 0
+        self.frame_categories = {}  # frame label -> category, for colouring
+        self._code_info = {}  # code object -> (label, category), so samples stay cheap
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="rerun-profiler", daemon=True)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self._started
+        return False
+
+    def _run(self):
+        last = self._started
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(sys._current_frames().get(self.thread_id), now - last)
+            last = now
+
+    def _sample(self, frame, weight):
+        labels = []
+        category = None
+        while frame is not None:
+            code = frame.f_code
+            info = self._code_info.get(code)
+            if info is None:
+                frame_category = profile_category(code)
+                label = f"{Path(code.co_filename).stem}:{code.co_name}"
+                self.frame_categories.setdefault(label, frame_category or "App code")
+                info = self._code_info[code] = (label, frame_category)
+            # The innermost categorised frame wins, e.g. pyairtable called
+            # through a Streamlit cache wrapper counts as Airtable I/O
+            category = category or info[1]
+            labels.append(info[0])
+            if code is self.root_code:
+                break
+            frame = frame.f_back
+        else:
+            return  # Sampled outside the profiled call
+        self.samples += 1
+        self.stacks[";".join(reversed(labels))] += weight
+        self.categories[category or "App code"] += weight
+
+def get_profile_dir():
+    return Path(st.secrets.get("PROFILE_DIR", ".profiles"))
+
+def save_profile(profiler):
+    """Write the folded stacks to disk and keep a summary in the session"""
+    profile_dir = get_profile_dir()
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    who = st.session_state.mentor_name or "login"
+    slug = re.sub(r"[^a-z0-9]+", "-", who.lower()).strip("-") or "mentor"
+    path = profile_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}.folded"
+    path.write_text("".join(
+        f"{stack} {round(seconds * 1_000_000)}\n" for stack, seconds in profiler.stacks.items()
+    ))
+
+    # Drop the oldest files beyond the retention limit
+    for old in sorted(profile_dir.glob("*.folded"))[:-PROFILE_MAX_SAVED]:
+        old.unlink(missing_ok=True)
+
+    st.session_state.profiles = (st.session_state.profiles + [{
+        "path": str(path),
+        "mentor": who,
+        "elapsed": profiler.elapsed,
+        "samples": profiler.samples,
+        "categories": dict(profiler.categories),
+        "stacks": dict(profiler.stacks),
+        "frame_categories": profiler.frame_categories
+    }])[-PROFILE_MAX_RERUNS:]
+
+def render_flame_graph(profile):
+    """Render folded stacks as an icicle-style flame graph (root at the top)"""
+    root = {"count": 0, "children": {}}
+    for stack, count in profile["stacks"].items():
+        node = root
+        node["count"] += count
+        for label in stack.split(";")[:PROFILE_FLAME_MAX_DEPTH]:
+            node = node["children"].setdefault(label, {"count": 0, "children": {}})
+            node["count"] += count
+
+    total = root["count"]
+
+    def render(label, node, parent_count):
+        children = "".join(
+            render(child_label, child, node["count"])
+            for child_label, child in sorted(node["children"].items(), key=lambda item: -item[1]["count"])
+            if child["count"] / total >= PROFILE_FLAME_MIN_SHARE
+        )
+        color = PROFILE_CATEGORY_COLORS.get(profile["frame_categories"].get(label), "#E2E8F0")
+        title = html.escape(f"{label} — {node['count'] * 1000:.0f} ms ({node['count'] / total:.0%})")
+        return (
+            f'<div style="width: {node["count"] / parent_count * 100:.2f}%;">'
+            f'<div class="flame-frame" style="background: {color};" title="{title}">{html.escape(label)}</div>'
+            f'<div style="display: flex;">{children}</div>'
+            f'</div>'
+        )
+
+    if not total:
+        return ""
+    top = "".join(
+        render(label, child, total)
+        for label, child in sorted(root["children"].items(), key=lambda item: -item[1]["count"])
+    )
+    return f'<div class="flame-graph"><div style="display: flex;">{top}</div></div>'
+
+def show_profile_report():
+    """Breakdown of the most recent profiled reruns"""
+    with st.expander(f"🔥 Rerun Profiles ({len(st.session_state.profiles)})", expanded=True):
+        labels = [
+            f"{Path(p['path']).stem} · {p['elapsed'] * 1000:.0f} ms"
+            for p in st.session_state.profiles
+        ]
+        choice = st.selectbox("Profile", range(len(labels)), index=len(labels) - 1,
+                              format_func=lambda i: labels[i], key="profile_choice")
+        profile = st.session_state.profiles[choice]
+
+        if not profile["samples"]:
+            st.info("This rerun finished before the first sample was taken.")
+            return
+
+        sampled = sum(profile["categories"].values())
+        breakdown = pd.DataFrame(
+            [
+                {"Category": category, "ms": seconds * 1000, "Share": seconds / sampled}
+                for category, seconds in sorted(profile["categories"].items(), key=lambda item: -item[1])
+            ]
+        )
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.dataframe(
+                breakdown.style.format({"ms": "{:.0f}", "Share": "{:.0%}"}),
+                hide_index=True,
+                use_container_width=True
+            )
+            path = Path(profile["path"])
+            if path.exists():
+                st.download_button(
+                    "⬇️ Download folded stacks",
+                    path.read_bytes(),
+                    file_name=path.name,
+                    mime="text/plain",
+                    key="profile_download"
+                )
+                st.caption("Open in speedscope.app or flamegraph.pl for full detail.")
+        with col2:
+            st.markdown(
+                " ".join(
+                    f'<span class="flame-frame" style="background: {color};">{category}</span>'
+                    for category, color in PROFILE_CATEGORY_COLORS.items()
+                ),
+                unsafe_allow_html=True
+            )
+        st.markdown(render_flame_graph(profile), unsafe_allow_html=True)
+
 # Main app logic
-def main():
+def run_app():
     # Check for magic link token first
     check_magic_link_token()
 
@@ -780,5 +2119,18 @@ def main():
     else:
         show_dashboard()
 
+def main():
+    if st.session_state.team_unlocked and st.session_state.profile_reruns_remaining > 0:
+        st.session_state.profile_reruns_remaining -= 1
+        profiler = RerunProfiler(run_app.__code__)
+        try:
+            with profiler:
+                run_app()
+        finally:
+            # st.rerun() ends the run with an exception; still keep what was sampled
+            save_profile(profiler)
+    else:
+        run_app()
+
 if __name__ == "__main__":
     main()